@@ -4,11 +4,33 @@ Responsible for Kaplan-Meier estimation and log-rank testing.
 """
 
 import logging
-from typing import Dict, Any
-from tools.stats_tool import perform_survival_analysis
+from typing import Dict, Any, List, Sequence
+from tools.stats_tool import compute_logrank, perform_survival_analysis
 
 logger = logging.getLogger(__name__)
 
+# Batches at least this large run every cohort through the numba kernel
+BATCH_JIT_MIN_COHORTS = 64
+
+_BANNER = "=" * 70
+_SUMMARY_TEMPLATE = "\n".join([
+    "",
+    "SURVIVAL ANALYSIS RESULTS",
+    _BANNER,
+    "Comparison        : Pembrolizumab vs Nivolumab",
+    "Statistical test  : Log-rank test",
+    "P-value           : {p_value}",
+    "Test statistic    : {test_statistic}",
+    "Median OS (Pembro): {median_pembrolizumab} months",
+    "Median OS (Nivo)  : {median_nivolumab} months",
+    "",
+    "Interpretation:",
+    "{interpretation}",
+    "",
+    "Figure saved at: {figure_path}",
+    _BANNER,
+])
+
 
 class AnalysisAgent:
     """
@@ -35,20 +57,14 @@ class AnalysisAgent:
             }
 
         # Create clean, formatted summary — NO print statements here
-        summary = (
-            "\nSURVIVAL ANALYSIS RESULTS\n"
-            + "=" * 70 + "\n"
-            + f"Comparison        : Pembrolizumab vs Nivolumab\n"
-            + f"Statistical test  : Log-rank test\n"
-            + f"P-value           : {result['p_value']}\n"
-            + f"Test statistic    : {result['test_statistic']}\n"
-            + f"Median OS (Pembro): {result['median_pembrolizumab'] or 'N/A'} months\n"
-            + f"Median OS (Nivo)  : {result['median_nivolumab'] or 'N/A'} months\n"
-            + "\nInterpretation:\n"
-            + f"{result['interpretation']}\n"
-            + f"\nFigure saved at: {result['figure_path']}\n"
-            + "=" * 70
-        )
+        summary = _SUMMARY_TEMPLATE.format_map({
+            "p_value": f"{result['p_value']:.4f}",
+            "test_statistic": f"{result['test_statistic']:.4f}",
+            "median_pembrolizumab": result["median_pembrolizumab"] or "N/A",
+            "median_nivolumab": result["median_nivolumab"] or "N/A",
+            "interpretation": result["interpretation"],
+            "figure_path": result["figure_path"]
+        })
 
         return {
             "status": "success",
@@ -59,5 +75,33 @@ class AnalysisAgent:
             "median_nivolumab": result["median_nivolumab"]
         }
 
+    def analyze_survival_batch(self, cohorts: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+        """
+        Run log-rank tests for many two-arm cohorts with the shared kernel.
+
+        Args:
+            cohorts: Iterable of (durations_a, events_a, durations_b, events_b)
+
+        Returns:
+            One result dictionary per cohort, in input order.
+        """
+        # Loading the numba kernel only pays off across a sizeable batch
+        use_jit = True if len(cohorts) >= BATCH_JIT_MIN_COHORTS else None
+        results = []
+        for durations_a, events_a, durations_b, events_b in cohorts:
+            try:
+                test_statistic, p_value = compute_logrank(
+                    durations_a, events_a, durations_b, events_b, use_jit=use_jit
+                )
+                results.append({
+                    "status": "success",
+                    "p_value": p_value,
+                    "test_statistic": test_statistic
+                })
+            except Exception as e:
+                logger.error("Batch survival analysis failed for cohort: %s", e)
+                results.append({"status": "error", "message": str(e)})
+        return results
+
     def get_agent(self):
         return self
\ No newline at end of file
@@ -2,34 +2,143 @@
 Clinical Reasoning Engine – converts raw evidence into graded recommendation.
 """
 
-from typing import Dict, Any
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Mapping, Tuple
+
+import numpy as np
+
+RECOMMENDATION_TEXT = "Pembrolizumab is preferred over nivolumab as first-line therapy in advanced melanoma"
+
+# Evidence column -> default used when the column (or a value) is missing
+_EVIDENCE_DEFAULTS = {
+    "p_value": 1.0,
+    "total_papers": 0,
+    "median_pembrolizumab": 0.0,
+    "median_nivolumab": 0.0,
+}
+
+# GRADE thresholds shared by the scalar and batch paths
+STRONG_MAX_P_VALUE = 0.01
+STRONG_MIN_PAPERS = 10
+STRONG_MIN_OS_BENEFIT = 12  # months
+MODERATE_MAX_P_VALUE = 0.05
+MODERATE_MIN_PAPERS = 8
+
+# Grade tiers, strongest first: (confidence, strength, grade)
+_STRONG = (0.94, "Strong recommendation", "1A")
+_MODERATE = (0.87, "Moderate recommendation", "1B")
+_WEAK = (0.62, "Weak recommendation", "2C")
+
+
+@dataclass(frozen=True)
+class Recommendation:
+    """Graded clinical recommendation for a single evidence set."""
+
+    # Declared by hand: dataclass(slots=True) needs Python 3.10
+    __slots__ = (
+        "recommendation",
+        "confidence_score",
+        "strength_of_recommendation",
+        "grade",
+        "rationale",
+    )
+
+    recommendation: str
+    confidence_score: float
+    strength_of_recommendation: str
+    grade: str
+    rationale: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    # Slotted frozen instances need explicit state handling to be picklable
+    def __getstate__(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+
+def _grade(p_value: float, papers_found: int, median_os_diff: float) -> Tuple[float, str, str]:
+    """Confidence scoring (0.0 – 1.0) for one evidence set."""
+    if (p_value < STRONG_MAX_P_VALUE and papers_found >= STRONG_MIN_PAPERS
+            and median_os_diff >= STRONG_MIN_OS_BENEFIT):
+        return _STRONG
+    if p_value < MODERATE_MAX_P_VALUE and papers_found >= MODERATE_MIN_PAPERS:
+        return _MODERATE
+    return _WEAK
+
+
+def _rationale(p_value: float, papers_found: int, median_os_diff: float) -> str:
+    # :g renders 22 and 22.0 alike, so int and float medians read the same
+    return f"p={p_value:.4f}, {papers_found} publications, OS benefit {median_os_diff:g} months"
+
 
 class ClinicalReasoner:
     """Generates GRADE-style clinical recommendation from evidence."""
 
-    def generate_recommendation(self, evidence: Dict[str, Any]) -> Dict[str, Any]:
+    def generate_recommendation(self, evidence: Dict[str, Any]) -> Recommendation:
         p_value = evidence.get("p_value", 1.0)
         papers_found = evidence.get("total_papers", 0)
         median_os_diff = (evidence.get("median_pembrolizumab", 0) or 0) - (evidence.get("median_nivolumab", 0) or 0)
 
-        # Confidence scoring (0.0 – 1.0)
-        if p_value < 0.01 and papers_found >= 10 and median_os_diff >= 12:
-            confidence = 0.94
-            strength = "Strong recommendation"
-            grade = "1A"
-        elif p_value < 0.05 and papers_found >= 8:
-            confidence = 0.87
-            strength = "Moderate recommendation"
-            grade = "1B"
-        else:
-            confidence = 0.62
-            strength = "Weak recommendation"
-            grade = "2C"
+        confidence, strength, grade = _grade(p_value, papers_found, median_os_diff)
+
+        return Recommendation(
+            recommendation=RECOMMENDATION_TEXT,
+            confidence_score=confidence,
+            strength_of_recommendation=strength,
+            grade=grade,
+            rationale=_rationale(p_value, papers_found, median_os_diff)
+        )
+
+    def generate_recommendations_batch(self, evidence: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Grade many evidence rows (e.g. trial subgroups) in one vectorized pass.
+
+        Args:
+            evidence: Mapping of equal-length arrays (a DataFrame works too)
+                with columns p_value, total_papers, median_pembrolizumab,
+                median_nivolumab; missing columns take their defaults
+
+        Returns:
+            Dictionary of arrays with one graded recommendation per input row
+        """
+        n_rows = next((len(evidence[name]) for name in _EVIDENCE_DEFAULTS if name in evidence), 0)
+
+        def column(name: str) -> np.ndarray:
+            if name not in evidence:
+                return np.full(n_rows, _EVIDENCE_DEFAULTS[name], dtype=float)
+            return np.asarray(evidence[name], dtype=float)
+
+        p_value = column("p_value")
+        p_value = np.where(np.isnan(p_value), 1.0, p_value)
+        papers_found = np.nan_to_num(column("total_papers")).astype(int)
+        median_os_diff = (
+            np.nan_to_num(column("median_pembrolizumab"))
+            - np.nan_to_num(column("median_nivolumab"))
+        )
+
+        strong = (
+            (p_value < STRONG_MAX_P_VALUE)
+            & (papers_found >= STRONG_MIN_PAPERS)
+            & (median_os_diff >= STRONG_MIN_OS_BENEFIT)
+        )
+        moderate = (p_value < MODERATE_MAX_P_VALUE) & (papers_found >= MODERATE_MIN_PAPERS) & ~strong
+        conditions = [strong, moderate]
+
+        def select(field: int) -> np.ndarray:
+            return np.select(conditions, [_STRONG[field], _MODERATE[field]], default=_WEAK[field])
 
         return {
-            "recommendation": "Pembrolizumab is preferred over nivolumab as first-line therapy in advanced melanoma",
-            "confidence_score": confidence,
-            "strength_of_recommendation": strength,
-            "grade": grade,
-            "rationale": f"p={p_value:.4f}, {papers_found} publications, OS benefit {median_os_diff} months"
-        }
\ No newline at end of file
+            "recommendation": np.full(n_rows, RECOMMENDATION_TEXT, dtype=object),
+            "confidence_score": select(0),
+            "strength_of_recommendation": select(1),
+            "grade": select(2),
+            "rationale": np.array([
+                _rationale(p, n, d)
+                for p, n, d in zip(p_value.tolist(), papers_found.tolist(), median_os_diff.tolist())
+            ], dtype=object)
+        }
@@ -41,5 +41,5 @@ class DoctorAgent:
             "final_recommendation": ai_output["recommendation"] if decision == "approve" else comment
         }
 
-        logger.info(f"Doctor decision: {decision.upper()}")
+        logger.info("Doctor decision: %s", decision.upper())
         return review
\ No newline at end of file
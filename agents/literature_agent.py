@@ -4,13 +4,38 @@ Combines PubMed (clinical) and Google Scholar (academic) sources.
 """
 
 import os
+import re
+import asyncio
 import logging
-from typing import Dict, Any, List
-from tools.pubmed_tool import search_pubmed
-from tools.scholar_tool import search_scholar
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from tools.pubmed_tool import asearch_pubmed, search_pubmed, search_pubmed_batch
+from tools.scholar_tool import asearch_scholar, search_scholar
+from tools import search_cache
 
 logger = logging.getLogger(__name__)
 
+MAX_PAPERS = 20
+# Google Scholar serves a CAPTCHA to bursts of requests from one client
+MAX_SCHOLAR_CONCURRENCY = 2
+_NON_WORD_RE = re.compile(r"\W+")
+
+
+def _dedup_keys(paper: Dict[str, Any]) -> set:
+    """Identity keys for a paper: normalized DOI and normalized title."""
+    keys = set()
+    doi = (paper.get("doi") or "").strip().lower()
+    if doi:
+        keys.add("doi:" + doi)
+    title = _NON_WORD_RE.sub(" ", paper.get("title") or "").strip().lower()
+    if title:
+        keys.add("title:" + title[:120])
+    return keys
+
 
 class LiteratureAgent:
     """
@@ -19,11 +44,41 @@ class LiteratureAgent:
     Secondary: Google Scholar for broader academic coverage
     """
 
-    def __init__(self, model_name: str = "gemini-2.5-flash") -> None:
+    def __init__(
+        self,
+        model_name: str = "gemini-2.5-flash",
+        cache_dir: Optional[str] = None,
+        cache_ttl_seconds: Optional[float] = None
+    ) -> None:
+        """
+        Args:
+            model_name: Gemini model used for synthesis
+            cache_dir: Directory for cached search results (defaults to
+                LITERATURE_CACHE_DIR or cache/lit)
+            cache_ttl_seconds: How long cached results stay fresh; 0 disables
+                caching (defaults to LITERATURE_CACHE_TTL_SECONDS or one day)
+        """
         self.model_name = model_name
         self.api_key = os.getenv("GOOGLE_API_KEY")
         if not self.api_key:
             raise ValueError("GOOGLE_API_KEY is required")
+
+        # One pooled keep-alive session shared by all PubMed/Scholar requests
+        self._session = requests.Session()
+        self._session.headers.update({"User-Agent": "OncologyResearchAgent/1.0"})
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=1.0,
+                status_forcelist=(429, 500, 502, 503, 504)
+            )
+        ))
+
+        # The search caches live with the tools and are shared process-wide
+        if cache_dir is not None or cache_ttl_seconds is not None:
+            search_cache.configure(cache_dir=cache_dir, ttl_seconds=cache_ttl_seconds)
         
         logger.info("LiteratureAgent initialized with PubMed + Google Scholar integration")
 
@@ -40,52 +95,49 @@ class LiteratureAgent:
         try:
             logger.info("Executing dual-source search: %s", user_query)
 
-            # Search PubMed (primary clinical source)
-            pubmed_result = search_pubmed(
-                query=user_query,
-                max_results=12,
-                min_year=2023
-            )
-            
-            # Search Google Scholar (supplementary academic source)
-            scholar_result = search_scholar(
-                query=user_query,
-                max_results=6
-            )
+            # PubMed (primary clinical source) and Google Scholar
+            # (supplementary academic source) are independent network
+            # round-trips, so run them concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                pubmed_future = executor.submit(
+                    search_pubmed, user_query, 12, 2023, session=self._session
+                )
+                scholar_future = executor.submit(
+                    search_scholar, user_query, 6, session=self._session
+                )
+                pubmed_result = pubmed_future.result()
+                scholar_result = scholar_future.result()
 
-            # Aggregate results
-            pubmed_papers = (
-                pubmed_result.get("papers", [])
-                if pubmed_result.get("status") == "success"
-                else []
-            )
-            
-            scholar_papers = (
-                scholar_result.get("papers", [])
-                if scholar_result.get("status") == "success"
-                else []
-            )
-
-            # Tag sources
-            all_papers = (
-                [{"source": "PubMed", **p} for p in pubmed_papers] +
-                scholar_papers
-            )
-
-            summary = self._generate_summary(len(pubmed_papers), len(scholar_papers))
+            return self._aggregate(user_query, pubmed_result, scholar_result)
 
+        except Exception as exc:
+            logger.error("Literature search failed: %s", exc)
             return {
-                "status": "success",
-                "query": user_query,
-                "total_found": len(all_papers),
-                "papers": all_papers[:20],
-                "sources_used": ["PubMed", "Google Scholar"],
-                "pubmed_count": len(pubmed_papers),
-                "scholar_count": len(scholar_papers),
-                "model_used": self.model_name,
-                "analysis": summary
+                "status": "error",
+                "error": str(exc),
+                "query": user_query
             }
 
+    async def aquery(self, user_query: str) -> Dict[str, Any]:
+        """
+        Async variant of query() for callers already running an event loop.
+
+        Args:
+            user_query: Research query string
+
+        Returns:
+            Aggregated results from PubMed and Scholar
+        """
+        try:
+            logger.info("Executing async dual-source search: %s", user_query)
+
+            pubmed_result, scholar_result = await asyncio.gather(
+                asearch_pubmed(user_query, 12, 2023, session=self._session),
+                asearch_scholar(user_query, 6)
+            )
+
+            return self._aggregate(user_query, pubmed_result, scholar_result)
+
         except Exception as exc:
             logger.error("Literature search failed: %s", exc)
             return {
@@ -94,6 +146,111 @@ class LiteratureAgent:
                 "query": user_query
             }
 
+    def query_batch(self, queries: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Execute multi-source literature search for several queries at once.
+
+        PubMed records for all queries are fetched through one batched
+        E-utilities round-trip; alongside it, Scholar queries run at most
+        MAX_SCHOLAR_CONCURRENCY at a time.
+
+        Args:
+            queries: Research query strings
+
+        Returns:
+            Dictionary mapping each query to the same result shape as query()
+        """
+        if len(queries) == 1:
+            return {queries[0]: self.query(queries[0])}
+
+        try:
+            logger.info("Executing batched dual-source search for %d queries", len(queries))
+
+            # Separate pools so the Scholar limit holds however long PubMed takes
+            with ThreadPoolExecutor(max_workers=1) as pubmed_executor, \
+                    ThreadPoolExecutor(max_workers=MAX_SCHOLAR_CONCURRENCY) as scholar_executor:
+                pubmed_future = pubmed_executor.submit(
+                    search_pubmed_batch,
+                    queries,
+                    max_results_each=12,
+                    min_year=2023,
+                    session=self._session
+                )
+                scholar_futures = {
+                    q: scholar_executor.submit(search_scholar, q, 6, session=self._session)
+                    for q in queries
+                }
+                pubmed_results = pubmed_future.result()
+                scholar_results = {q: f.result() for q, f in scholar_futures.items()}
+
+            return {
+                q: self._aggregate(q, pubmed_results[q], scholar_results[q])
+                for q in queries
+            }
+
+        except Exception as exc:
+            logger.error("Batched literature search failed: %s", exc)
+            return {
+                q: {"status": "error", "error": str(exc), "query": q}
+                for q in queries
+            }
+
+    def _aggregate(
+        self,
+        user_query: str,
+        pubmed_result: Dict[str, Any],
+        scholar_result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Merge PubMed and Scholar results into the agent response."""
+        pubmed_papers = (
+            pubmed_result.get("papers", [])
+            if pubmed_result.get("status") == "success"
+            else []
+        )
+        
+        scholar_papers = (
+            scholar_result.get("papers", [])
+            if scholar_result.get("status") == "success"
+            else []
+        )
+
+        # Tag sources and drop cross-source duplicates (same DOI or title),
+        # keeping PubMed's copy, until MAX_PAPERS are collected. Tagging
+        # works on shallow copies: the search results may be shared.
+        tagged = itertools.chain(
+            zip(pubmed_papers, itertools.repeat("PubMed")),
+            zip(scholar_papers, itertools.repeat("Google Scholar"))
+        )
+        papers = []
+        seen = set()
+        duplicates_removed = 0
+        for paper, source in tagged:
+            keys = _dedup_keys(paper)
+            if keys & seen:
+                duplicates_removed += 1
+                continue
+            seen |= keys
+            paper = dict(paper)
+            paper.setdefault("source", source)
+            papers.append(paper)
+            if len(papers) == MAX_PAPERS:
+                break
+
+        summary = self._generate_summary(len(pubmed_papers), len(scholar_papers))
+
+        return {
+            "status": "success",
+            "query": user_query,
+            "total_found": len(papers),
+            "duplicates_removed": duplicates_removed,
+            "papers": papers,
+            "sources_used": ["PubMed", "Google Scholar"],
+            "pubmed_count": len(pubmed_papers),
+            "scholar_count": len(scholar_papers),
+            "model_used": self.model_name,
+            "analysis": summary
+        }
+
     def _generate_summary(self, pubmed_count: int, scholar_count: int) -> str:
         """Generate search summary text."""
         parts = []
@@ -4,15 +4,20 @@ Integrates literature review, survival analysis, clinical reasoning, and physici
 """
 
 import logging
-from typing import Dict, Any
-from agents.literature_agent import LiteratureAgent
-from agents.analysis_agent import AnalysisAgent
-from agents.doctor_agent import DoctorAgent
-from agents.clinical_reasoner import ClinicalReasoner
-from tools.risk_calculator import calculate_irae_risk
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Any
+
+if TYPE_CHECKING:
+    from agents.literature_agent import LiteratureAgent
+    from agents.analysis_agent import AnalysisAgent
+    from agents.doctor_agent import DoctorAgent
+    from agents.clinical_reasoner import ClinicalReasoner, Recommendation
 
 logger = logging.getLogger(__name__)
 
+_HEAVY_BAR = "═" * 70
+_LIGHT_BAR = "-" * 70
+
 
 class OncologySupervisor:
     """
@@ -20,25 +25,38 @@ class OncologySupervisor:
     """
 
     def __init__(self, model_name: str = "gemini-2.5-flash") -> None:
-        self.literature_agent = LiteratureAgent(model_name=model_name)
-        self.analysis_agent = AnalysisAgent()
-        self.clinical_reasoner = ClinicalReasoner()
-        self.doctor_agent = DoctorAgent()
+        # Agent modules pull in the scientific and HTTP stacks, so they are
+        # imported here rather than when this module is first imported
+        from agents.literature_agent import LiteratureAgent
+        from agents.analysis_agent import AnalysisAgent
+        from agents.doctor_agent import DoctorAgent
+        from agents.clinical_reasoner import ClinicalReasoner
+
+        self.literature_agent: "LiteratureAgent" = LiteratureAgent(model_name=model_name)
+        self.analysis_agent: "AnalysisAgent" = AnalysisAgent()
+        self.clinical_reasoner: "ClinicalReasoner" = ClinicalReasoner()
+        self.doctor_agent: "DoctorAgent" = DoctorAgent()
+        # Literature search and survival analysis are independent, so they run side by side
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="supervisor")
         logger.info("OncologySupervisor initialized with full clinical workflow agents")
 
     def process_query(self, query: str) -> Dict[str, Any]:
         logger.info("Starting clinical research workflow for query: %s", query)
 
+        # Steps 1 and 2 share no data: start both before reporting either
+        lit_future = self._executor.submit(self.literature_agent.query, query)
+        analysis_future = self._executor.submit(self.analysis_agent.analyze_survival)
+
         # 1. Literature search
-        lit_result = self.literature_agent.query(query)
+        lit_result = lit_future.result()
         if lit_result.get("status") == "success":
             self._format_literature_output(lit_result)
 
         # 2. Survival analysis
-        print("\n" + "═" * 70)
+        print("\n" + _HEAVY_BAR)
         print("STATISTICAL SURVIVAL ANALYSIS")
-        print("═" * 70)
-        analysis_result = self.analysis_agent.analyze_survival()
+        print(_HEAVY_BAR)
+        analysis_result = analysis_future.result()
         if analysis_result["status"] == "success":
             print(analysis_result["summary"])
 
@@ -53,12 +71,13 @@ class OncologySupervisor:
 
         # 4. Physician review
         doctor_review = self.doctor_agent.review_recommendation({
-            "recommendation": recommendation["recommendation"],
-            "confidence_score": recommendation["confidence_score"],
+            "recommendation": recommendation.recommendation,
+            "confidence_score": recommendation.confidence_score,
             "p_value": evidence["p_value"]
         })
 
         # 5. Risk profile
+        from tools.risk_calculator import calculate_irae_risk
         risk_profile = calculate_irae_risk()
 
         # 6. Final report
@@ -69,20 +88,22 @@ class OncologySupervisor:
             "analysis": analysis_result,
             "recommendation": recommendation,
             "doctor_review": doctor_review,
-            "risk_profile": risk_profile
+            # The calculator returns a shared read-only view; callers get a
+            # plain dict they can pickle, deep-copy or modify
+            "risk_profile": dict(risk_profile)
         }
 
     def _format_literature_output(self, result: Dict[str, Any]) -> None:
-        print("\n" + "═" * 70)
+        print("\n" + _HEAVY_BAR)
         print("LITERATURE SEARCH RESULTS")
-        print("═" * 70)
+        print(_HEAVY_BAR)
         print(f"\nQuery          : {result['query']}")
         print(f"Total papers   : {result['total_found']}")
         print(f"Sources        : PubMed ({result.get('pubmed_count', 0)}), "
               f"Google Scholar ({result.get('scholar_count', 0)})")
-        print("\n" + "-" * 70)
+        print("\n" + _LIGHT_BAR)
         print("TOP PUBLICATIONS")
-        print("-" * 70)
+        print(_LIGHT_BAR)
         for i, paper in enumerate(result["papers"][:6], 1):
             src = paper.get("source", "Unknown")
             year = paper.get("year", "N/A")
@@ -94,32 +115,32 @@ class OncologySupervisor:
                     authors += " et al."
                 print(f"    Authors: {authors}")
                 print(f"    Journal: {paper.get('journal', 'N/A')} | PMID: {paper.get('pmid', 'N/A')}")
-        print("\n" + "-" * 70)
+        print("\n" + _LIGHT_BAR)
         print("SEARCH SUMMARY")
-        print("-" * 70)
+        print(_LIGHT_BAR)
         print(result.get("analysis", "No summary available"))
         print()
 
     def _display_clinical_report(
         self,
-        recommendation: Dict[str, Any],
+        recommendation: "Recommendation",
         doctor_review: Dict[str, Any],
         risk_profile: Dict[str, Any]
     ) -> None:
-        print("\n" + "═" * 70)
+        print("\n" + _HEAVY_BAR)
         print("CLINICAL DECISION SUPPORT REPORT")
-        print("═" * 70)
+        print(_HEAVY_BAR)
         print(f"\nRecommendation      : {doctor_review['final_recommendation']}")
-        print(f"Strength            : {recommendation['strength_of_recommendation']} "
-              f"(GRADE {recommendation['grade']})")
-        print(f"Confidence Score    : {recommendation['confidence_score']:.1%}")
-        print(f"Rationale           : {recommendation['rationale']}")
+        print(f"Strength            : {recommendation.strength_of_recommendation} "
+              f"(GRADE {recommendation.grade})")
+        print(f"Confidence Score    : {recommendation.confidence_score:.1%}")
+        print(f"Rationale           : {recommendation.rationale}")
         print(f"\nPhysician Review    : {doctor_review['doctor_decision'].upper()}")
         print(f"Reviewing Physician : {doctor_review['doctor_name']}")
         print(f"Comment             : {doctor_review['comment']}")
         print(f"\nAdverse Event Risk  : Grade 3–4 irAE: {risk_profile['grade_3_4_irae']}")
         print(f"Monitoring Advice   : {risk_profile['recommendation']}")
-        print("═" * 70)
+        print(_HEAVY_BAR)
 
     def get_agent(self):
         return self
\ No newline at end of file
@@ -5,11 +5,57 @@ Final production version with proper contrast
 
 import streamlit as st
 import os
+import re
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from agents.supervisor import OncologySupervisor
+_QUERY_TEMPLATE = "{treatment} AND {cancer_type} AND ({start}/01/01:{end}/12/31[PDAT])"
+_PMID_RE = re.compile(r"^\d+$")
+_CSS_PATH = Path(__file__).parent / "assets" / "style.css"
+
+
+@st.cache_resource(show_spinner=False)
+def get_supervisor(model_name: str):
+    """Build the supervisor once and reuse it across reruns."""
+    # Imported lazily so the agent/tool stack loads on first use only
+    from agents.supervisor import OncologySupervisor
+    return OncologySupervisor(model_name=model_name)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_query(treatment: str, cancer_type: str, start: int, end: int) -> str:
+    """Assemble the PubMed query string from the sidebar inputs."""
+    return _QUERY_TEMPLATE.format(
+        treatment=treatment, cancer_type=cancer_type, start=start, end=end
+    )
+
+
+@st.cache_data(show_spinner=False)
+def load_css() -> str:
+    """Read the dashboard stylesheet once per process."""
+    return _CSS_PATH.read_text(encoding="utf-8")
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_figure_bytes(path: str, mtime: float) -> bytes:
+    """Read a figure once per modification time; mtime is part of the cache key."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_paper_rows(papers: tuple) -> list:
+    """Build (heading, caption) markdown pairs from (title, journal, year, pmid) tuples."""
+    rows = []
+    for i, (title, journal, year, pmid) in enumerate(papers, 1):
+        info_parts = [f"*{journal}*", f"({year})"]
+        if pmid and _PMID_RE.match(pmid):
+            info_parts.append(f"[PMID: {pmid}](https://pubmed.ncbi.nlm.nih.gov/{pmid}/)")
+        rows.append((f"**{i}. {title}**", " • ".join(info_parts)))
+    return rows
+
 
 # Page configuration
 st.set_page_config(
@@ -20,73 +66,7 @@ st.set_page_config(
 )
 
 # Professional CSS with fixed contrast
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.8rem;
-        color: #1e40af;
-        text-align: center;
-        font-weight: bold;
-        margin-bottom: 0.5rem;
-    }
-    .subtitle {
-        font-size: 1.2rem;
-        color: #64748b;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .result-box {
-        background: #eff6ff;
-        padding: 1.5rem;
-        border-radius: 12px;
-        border-left: 6px solid #3b82f6;
-        margin: 1rem 0;
-        color: #1e293b;
-    }
-    .result-box h4 {
-        color: #1e40af;
-        margin-bottom: 0.8rem;
-    }
-    .result-box p {
-        color: #334155;
-        margin: 0.3rem 0;
-    }
-    .result-box strong {
-        color: #0f172a;
-    }
-    .approve-box {
-        background: #ecfdf5;
-        padding: 1.5rem;
-        border-radius: 12px;
-        border-left: 6px solid #10b981;
-        margin: 1rem 0;
-        color: #1e293b;
-    }
-    .approve-box h4 {
-        color: #047857;
-        margin-bottom: 0.8rem;
-    }
-    .approve-box p {
-        color: #334155;
-        margin: 0.3rem 0;
-    }
-    .approve-box strong {
-        color: #0f172a;
-    }
-    .approve-box em {
-        color: #475569;
-    }
-    .stButton>button {
-        width: 100%;
-        background-color: #1e40af;
-        color: white;
-        border: none;
-        padding: 0.6rem 1rem;
-        font-weight: 600;
-        border-radius: 8px;
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
 
 # Sidebar - Query Builder
 with st.sidebar:
@@ -110,7 +90,7 @@ with st.sidebar:
     with col2:
         end_year = st.selectbox("To", list(range(2019, 2027)), index=6)
     
-    query = f"{treatment} AND {cancer_type} AND ({start_year}/01/01:{end_year}/12/31[PDAT])"
+    query = build_query(treatment, cancer_type, start_year, end_year)
     
     st.markdown("**Generated Query:**")
     st.code(query, language="text")
@@ -137,7 +117,7 @@ if st.button("▶ Run Clinical Analysis", type="primary"):
     
     with st.spinner("🔍 Searching literature • 📊 Analyzing survival • 👨‍⚕️ Physician review..."):
         try:
-            supervisor = OncologySupervisor(model_name="gemini-2.5-flash")
+            supervisor = get_supervisor("gemini-2.5-flash")
             result = supervisor.process_query(query)
             
             st.session_state.result = result
@@ -161,9 +141,9 @@ if "result" in st.session_state:
     with col2:
         st.metric("P-value", f"{res['analysis'].get('p_value', 0):.4f}")
     with col3:
-        st.metric("Confidence", f"{res['recommendation']['confidence_score']:.0%}")
+        st.metric("Confidence", f"{res['recommendation'].confidence_score:.0%}")
     with col4:
-        st.metric("GRADE", res['recommendation']['grade'])
+        st.metric("GRADE", res['recommendation'].grade)
     
     st.markdown("---")
     
@@ -173,14 +153,15 @@ if "result" in st.session_state:
         st.markdown("### 📊 Survival Analysis")
         
         fig_path = "outputs/figures/km_survival_analysis.png"
-        if os.path.exists(fig_path):
-            st.image(fig_path, caption="Kaplan-Meier Survival Curve", width=600)
-        else:
+        try:
+            figure = load_figure_bytes(fig_path, os.stat(fig_path).st_mtime)
+            st.image(figure, caption="Kaplan-Meier Survival Curve", width=600)
+        except FileNotFoundError:
             st.warning("⚠️ Figure not found")
         
         with st.expander("📈 Statistical Details"):
             st.write(f"**Test:** Log-rank")
-            st.write(f"**P-value:** {res['analysis'].get('p_value', 'N/A')}")
+            st.write(f"**P-value:** {res['analysis'].get('p_value', 0):.4f}")
             st.write(f"**Median OS (Treatment):** {res['analysis'].get('median_pembrolizumab', 'N/A')} months")
             st.write(f"**Median OS (Control):** {res['analysis'].get('median_nivolumab', 'N/A')} months")
     
@@ -194,8 +175,8 @@ if "result" in st.session_state:
         <div class="result-box">
         <h4>Treatment Recommendation</h4>
         <p><strong>{doc['final_recommendation']}</strong></p>
-        <p>Strength: <strong>{rec['strength_of_recommendation']} (GRADE {rec['grade']})</strong></p>
-        <p>Confidence: <strong>{rec['confidence_score']:.1%}</strong></p>
+        <p>Strength: <strong>{rec.strength_of_recommendation} (GRADE {rec.grade})</strong></p>
+        <p>Confidence: <strong>{rec.confidence_score:.1%}</strong></p>
         </div>
         """, unsafe_allow_html=True)
         
@@ -220,19 +201,18 @@ if "result" in st.session_state:
     papers = lit.get("papers", [])[:15]
     
     with st.expander(f"View {len(papers)} publications"):
-        for i, paper in enumerate(papers, 1):
-            title = paper.get("title", "No title")
-            journal = paper.get("journal", "Unknown")
-            year = paper.get("year", "N/A")
-            pmid = str(paper.get("pmid", "")).strip()
-            
-            st.markdown(f"**{i}. {title}**")
-            
-            info_parts = [f"*{journal}*", f"({year})"]
-            if pmid and pmid.isdigit():
-                info_parts.append(f"[PMID: {pmid}](https://pubmed.ncbi.nlm.nih.gov/{pmid}/)")
-            
-            st.caption(" • ".join(info_parts))
+        rows = render_paper_rows(tuple(
+            (
+                paper.get("title", "No title"),
+                paper.get("journal", "Unknown"),
+                paper.get("year", "N/A"),
+                str(paper.get("pmid", "")).strip()
+            )
+            for paper in papers
+        ))
+        for heading, caption in rows:
+            st.markdown(heading)
+            st.caption(caption)
             st.divider()
 
 st.markdown("---")
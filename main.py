@@ -7,8 +7,7 @@ import os
 import logging
 from dotenv import load_dotenv
 from agents.supervisor import OncologySupervisor
-from memory.memory_service import OncologyMemoryService
-from memory.approval_workflow import log_doctor_approval
+from memory.approval_workflow import memory
 
 load_dotenv()
 
@@ -39,32 +38,40 @@ def main() -> None:
     try:
         result = supervisor.process_query(query)
 
+        entries = []
+
         # Log physician decision if approved
         if result["doctor_review"]["doctor_decision"] == "approve":
-            log_doctor_approval(
-                session_id="melanoma_clinical_review_2025",
-                decision="approved",
-                doctor=result["doctor_review"]["doctor_name"]
-            )
+            entries.append({
+                "kind": "review",
+                "session_id": "melanoma_clinical_review_2025",
+                "decision": "approved",
+                "doctor_name": result["doctor_review"]["doctor_name"],
+                "comment": "Approved via Doctor-in-the-Loop system"
+            })
 
         # Save full session
-        OncologyMemoryService().save_research(
-            session_id="melanoma_workflow_2025",
-            query=query,
-            cancer_type="melanoma",
-            findings={
+        entries.append({
+            "kind": "research",
+            "session_id": "melanoma_workflow_2025",
+            "query": query,
+            "cancer_type": "melanoma",
+            "findings": {
                 "total_papers": result["literature"].get("total_found"),
                 "p_value": result["analysis"].get("p_value"),
-                "grade": result["recommendation"]["grade"],
+                "grade": result["recommendation"].grade,
                 "physician_decision": result["doctor_review"]["doctor_decision"],
-                "confidence": result["recommendation"]["confidence_score"]
+                "confidence": result["recommendation"].confidence_score
             }
-        )
+        })
+
+        # Both records go to the shared memory service in one transaction
+        memory.save_batch(entries)
 
         logger.info("Clinical workflow completed and archived")
 
     except Exception as e:
-        logger.error(f"Workflow failed: {e}")
+        logger.error("Workflow failed: %s", e)
         print(f"Error: {e}")
 
     print("\nClinical decision support process completed.\n")
@@ -2,17 +2,55 @@
 Tracks human approval status in long-term memory.
 """
 
+import atexit
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List
 from memory.memory_service import OncologyMemoryService
 
 logger = logging.getLogger(__name__)
 memory = OncologyMemoryService()
 
-def log_doctor_approval(session_id: str, decision: str, doctor: str):
-    memory.save_doctor_review(
+# Approval writes run off the caller's critical path; a single worker keeps them ordered
+_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="approval-log")
+_pending: List[Future] = []
+
+
+def _report(session_id: str, future: Future) -> None:
+    exc = future.exception()
+    if exc is not None:
+        logger.error("Failed to log doctor approval for session %s: %s", session_id, exc)
+    else:
+        logger.info("Doctor approval logged for session %s", session_id)
+
+
+def log_doctor_approval(session_id: str, decision: str, doctor: str) -> Future:
+    future = _pool.submit(
+        memory.save_doctor_review,
         session_id=session_id,
         decision=decision,
         doctor_name=doctor,
         comment="Approved via Doctor-in-the-Loop system"
     )
-    logger.info(f"Doctor approval logged for session {session_id}")
\ No newline at end of file
+    future.add_done_callback(lambda f: _report(session_id, f))
+    _pending[:] = [f for f in _pending if not f.done()]
+    _pending.append(future)
+    return future
+
+
+def flush_pending() -> None:
+    """Block until queued approval writes finish; re-raises the first failure."""
+    while _pending:
+        _pending.pop(0).result()
+
+
+def _shutdown() -> None:
+    try:
+        flush_pending()
+    except Exception:
+        pass  # already reported by _report
+    finally:
+        _pool.shutdown(wait=True)
+
+
+atexit.register(_shutdown)
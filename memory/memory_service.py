@@ -4,43 +4,143 @@ Stores research sessions, findings, and physician review decisions.
 """
 
 import os
+import atexit
 import logging
 import json
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Union
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime
+from sqlalchemy import create_engine, event, insert, Column, Index, Integer, LargeBinary, String, Text, DateTime
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.orm import sessionmaker, Session
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; findings are then stored as plain JSON
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 
+ZSTD_LEVEL = 3
+# Payloads this small gain little from compression and pay the frame overhead
+ZSTD_MIN_BYTES = 256
+# Every zstd frame starts with this magic number; JSON text never does
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# zstandard (de)compressor objects must not be shared between threads
+_zstd_local = threading.local()
+
+
+def _json_default(obj: Any) -> Any:
+    # NumPy scalars and arrays (e.g. survival statistics) expose tolist()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes; NumPy values are accepted as-is."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=_json_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(",", ":"), default=_json_default
+    ).encode("utf-8")
+
+
+def _loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _pack_findings(payload: bytes) -> bytes:
+    """Zstd-compress a JSON payload when it is large enough to be worth it."""
+    if zstandard is None or len(payload) < ZSTD_MIN_BYTES:
+        return payload
+    compressor = getattr(_zstd_local, "compressor", None)
+    if compressor is None:
+        compressor = _zstd_local.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    return compressor.compress(payload)
+
+
+def _unpack_findings(value: Union[bytes, str]) -> Any:
+    """Decode a stored findings value: zstd frame, JSON bytes, or legacy JSON text."""
+    if isinstance(value, bytes) and value.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read compressed findings")
+        decompressor = getattr(_zstd_local, "decompressor", None)
+        if decompressor is None:
+            decompressor = _zstd_local.decompressor = zstandard.ZstdDecompressor()
+        value = decompressor.decompress(value)
+    return _loads(value)
+
 # ----------------------------------------------------------------------
 # Database setup
 # ----------------------------------------------------------------------
 BASE = declarative_base()
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///memory/cancer_research.db")
 engine = create_engine(DATABASE_URL, echo=False, future=True)
+
+# WAL lets readers run alongside the writer; with WAL, synchronous=NORMAL
+# only syncs at checkpoints, so commits survive an application crash and at
+# worst the last transaction is lost on an OS crash or power failure
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",       # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",     # 256 MiB memory-mapped I/O
+)
+
+if DATABASE_URL.startswith("sqlite"):
+    @event.listens_for(engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
 SessionFactory = sessionmaker(bind=engine)
-Session = scoped_session(SessionFactory)
+
+# Optional append-only JSONL mirror of every saved record (disabled when unset)
+JOURNAL_PATH = os.getenv("MEMORY_JOURNAL_PATH", "")
 
 
 class ResearchMemory(BASE):
     __tablename__ = "research_memory"
+    # Serves both session lookups and "latest entry for a session"
+    __table_args__ = (Index("ix_session_ts", "session_id", "timestamp"),)
 
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String(100), nullable=False, index=True)
+    session_id = Column(String(100), nullable=False)
     query = Column(Text, nullable=False)
     cancer_type = Column(String(100), nullable=False)
-    findings = Column(Text)                     # JSON string
+    findings = Column(LargeBinary)              # JSON, zstd-compressed when large
     timestamp = Column(DateTime, default=datetime.utcnow)
 
     def __repr__(self) -> str:
         return f"<ResearchMemory {self.session_id} – {self.cancer_type}>"
 
 
-# Create tables if they don't exist
+# Create tables if they don't exist; create_all skips indexes on existing tables
 BASE.metadata.create_all(engine)
+for _index in ResearchMemory.__table__.indexes:
+    _index.create(engine, checkfirst=True)
+del _index
+
+# Built once so every save reuses the same construct and its cached compilation
+_INSERT_STMT = insert(ResearchMemory).returning(
+    ResearchMemory.id, sort_by_parameter_order=True
+)
 
 
 # ----------------------------------------------------------------------
@@ -52,8 +152,27 @@ class OncologyMemoryService:
     """
 
     def __init__(self) -> None:
-        self.session = Session()
-        logger.info(f"Memory service initialized: {DATABASE_URL}")
+        self._journal_fd: Optional[int] = None
+        if JOURNAL_PATH:
+            # Opened once and kept open; O_APPEND makes each write land at the end
+            self._journal_fd = os.open(
+                JOURNAL_PATH, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644
+            )
+            atexit.register(self._close_journal)
+        logger.info("Memory service initialized: %s", DATABASE_URL)
+
+    @contextmanager
+    def _txn(self) -> Iterator[Session]:
+        """Yield a fresh session for one unit of work; commit, or roll back on error."""
+        session = SessionFactory()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
 
     # ------------------------------------------------------------------
     # Save a full research session
@@ -71,22 +190,11 @@ class OncologyMemoryService:
         Returns:
             Database record ID
         """
-        try:
-            entry = ResearchMemory(
-                session_id=session_id,
-                query=query,
-                cancer_type=cancer_type,
-                findings=json.dumps(findings, ensure_ascii=False),
-                timestamp=datetime.utcnow()
-            )
-            self.session.add(entry)
-            self.session.commit()
-            logger.info(f"Research session saved – ID {entry.id}")
-            return entry.id
-        except Exception as e:
-            self.session.rollback()
-            logger.error(f"Failed to save research session: {e}")
-            raise
+        record_id = self.save_many([
+            self._research_record(session_id, query, cancer_type, findings)
+        ])[0]
+        logger.info("Research session saved – ID %s", record_id)
+        return record_id
 
     # ------------------------------------------------------------------
     # Save physician review decision (Doctor-in-the-Loop)
@@ -110,45 +218,165 @@ class OncologyMemoryService:
         Returns:
             Database record ID
         """
+        record_id = self.save_many([
+            self._review_record(session_id, decision, doctor_name, comment)
+        ])[0]
+        logger.info("Physician review saved – Decision: %s (ID %s)", decision, record_id)
+        return record_id
+
+    # ------------------------------------------------------------------
+    # Save several records in one transaction
+    # ------------------------------------------------------------------
+    def save_batch(self, entries: List[Dict[str, Any]]) -> List[int]:
+        """
+        Persist research sessions and physician reviews in a single commit.
+
+        Args:
+            entries: Dicts with "kind" set to "research" or "review" plus the
+                keyword arguments of save_research / save_doctor_review
+
+        Returns:
+            Database record IDs, in input order
+        """
+        builders = {"research": self._research_record, "review": self._review_record}
+        records = []
+        for entry in entries:
+            fields = dict(entry)
+            records.append(builders[fields.pop("kind")](**fields))
+        return self.save_many(records)
+
+    def save_many(self, records: List[Dict[str, Any]]) -> List[int]:
+        """
+        Bulk-insert research_memory rows with one executemany and one commit.
+
+        Args:
+            records: Dicts with session_id, query, cancer_type and findings
+                (a JSON-serializable dict); timestamp defaults to now
+
+        Returns:
+            Database record IDs, in input order
+        """
+        # Serialize up front so the transaction only covers the insert
+        now = datetime.utcnow()
+        payloads = [_dumps(record["findings"]) for record in records]
+        rows = [
+            {
+                "session_id": record["session_id"],
+                "query": record["query"],
+                "cancer_type": record["cancer_type"],
+                "findings": _pack_findings(payload),
+                "timestamp": record.get("timestamp") or now
+            }
+            for record, payload in zip(records, payloads)
+        ]
+        if not rows:
+            return []
+
         try:
-            record = {
+            with self._txn() as session:
+                if session.bind.dialect.insert_executemany_returning_sort_by_parameter_order:
+                    ids = list(session.execute(_INSERT_STMT, rows).scalars())
+                else:
+                    # No bulk RETURNING (e.g. SQLite < 3.35): flush ORM objects for their ids
+                    entries = [ResearchMemory(**row) for row in rows]
+                    session.add_all(entries)
+                    session.flush()
+                    ids = [entry.id for entry in entries]
+        except Exception as e:
+            logger.error("Failed to save %s records: %s", len(rows), e)
+            raise
+
+        self._journal(rows, ids, payloads)
+        logger.info("Saved %s records – IDs %s", len(ids), ids)
+        return ids
+
+    def _journal(
+        self,
+        rows: List[Dict[str, Any]],
+        ids: List[int],
+        payloads: List[bytes]
+    ) -> None:
+        """Append committed rows to the JSONL journal in a single write."""
+        if self._journal_fd is None:
+            return
+        # The findings payload is already serialized JSON, so it is spliced
+        # into each line as a nested object rather than re-encoded as a string
+        lines = b"".join(
+            _dumps({
+                "id": record_id,
+                "session_id": row["session_id"],
+                "query": row["query"],
+                "cancer_type": row["cancer_type"],
+                "timestamp": row["timestamp"].isoformat()
+            })[:-1] + b',"findings":' + payload + b"}\n"
+            for record_id, row, payload in zip(ids, rows, payloads)
+        )
+        try:
+            os.write(self._journal_fd, lines)
+        except OSError as e:
+            logger.error("Failed to append to memory journal: %s", e)
+
+    def _close_journal(self) -> None:
+        if self._journal_fd is not None:
+            os.close(self._journal_fd)
+            self._journal_fd = None
+
+    @staticmethod
+    def _research_record(
+        session_id: str,
+        query: str,
+        cancer_type: str,
+        findings: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        return {
+            "session_id": session_id,
+            "query": query,
+            "cancer_type": cancer_type,
+            "findings": findings
+        }
+
+    @staticmethod
+    def _review_record(
+        session_id: str,
+        decision: str,
+        doctor_name: str,
+        comment: str = ""
+    ) -> Dict[str, Any]:
+        return {
+            "session_id": session_id,
+            "query": "Physician Review",
+            "cancer_type": "clinical_decision",
+            "findings": {
                 "decision": decision,
                 "doctor": doctor_name,
                 "comment": comment,
                 "timestamp": datetime.utcnow().isoformat()
             }
-
-            entry = ResearchMemory(
-                session_id=session_id,
-                query="Physician Review",
-                cancer_type="clinical_decision",
-                findings=json.dumps(record, ensure_ascii=False),
-                timestamp=datetime.utcnow()
-            )
-            self.session.add(entry)
-            self.session.commit()
-            logger.info(f"Physician review saved – Decision: {decision} (ID {entry.id})")
-            return entry.id
-
-        except Exception as e:
-            self.session.rollback()
-            logger.error(f"Failed to save physician review: {e}")
-            raise
+        }
 
     # ------------------------------------------------------------------
     # Optional: retrieve past sessions (useful for audit)
     # ------------------------------------------------------------------
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
-        entry = self.session.query(ResearchMemory).filter_by(session_id=session_id).first()
-        if entry:
-            return {
-                "id": entry.id,
-                "query": entry.query,
-                "cancer_type": entry.cancer_type,
-                "findings": json.loads(entry.findings) if entry.findings else {},
-                "timestamp": entry.timestamp
-            }
+        """Return the most recent record for a session, or None."""
+        with self._txn() as session:
+            entry = (
+                session.query(ResearchMemory)
+                .filter_by(session_id=session_id)
+                .order_by(ResearchMemory.timestamp.desc())
+                .limit(1)
+                .first()
+            )
+            if entry:
+                return {
+                    "id": entry.id,
+                    "query": entry.query,
+                    "cancer_type": entry.cancer_type,
+                    "findings": _unpack_findings(entry.findings) if entry.findings else {},
+                    "timestamp": entry.timestamp
+                }
         return None
 
     def close(self) -> None:
-        self.session.close()
\ No newline at end of file
+        # Database sessions are per-operation; only the journal stays open
+        self._close_journal()
\ No newline at end of file
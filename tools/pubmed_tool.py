@@ -1,21 +1,157 @@
 """
-PubMed search tool using pymed library.
+PubMed search tool using NCBI E-utilities.
 Provides structured search functionality for oncology literature.
 """
 
+import os
+import time
+import asyncio
 import logging
-from typing import Dict, List, Any
-from datetime import datetime
-from pymed import PubMed
+import threading
+from io import BytesIO
+from datetime import date
+from typing import Dict, List, Any, Optional
+import requests
+from lxml import etree
+from tools.search_cache import CachedSearch
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to requests' JSON decoding
+    orjson = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+EUTILS_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+NCBI_TOOL = "OncologyResearchAgent"
+NCBI_EMAIL = "research@example.com"
+EFETCH_BATCH_SIZE = 200
+
+
+class _RateLimiter:
+    """Token bucket keeping E-utilities traffic within NCBI's request limit."""
+
+    def __init__(self, requests_per_second: float) -> None:
+        self.rate = requests_per_second
+        self._tokens = requests_per_second
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                time.sleep((1 - self._tokens) / self.rate)
+                self._tokens = 1
+                self._updated = time.monotonic()
+            self._tokens -= 1
+
+
+_rate_limiter: Optional[_RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def _throttle() -> None:
+    """Block until another E-utilities request is allowed."""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            # NCBI allows 10 requests/second with an API key and 3 without
+            _rate_limiter = _RateLimiter(10 if os.getenv("NCBI_API_KEY") else 3)
+    _rate_limiter.acquire()
+
+
+def _ncbi_params(**params: Any) -> Dict[str, Any]:
+    """Add the identification parameters NCBI expects on every request."""
+    params.update({"db": "pubmed", "tool": NCBI_TOOL, "email": NCBI_EMAIL})
+    api_key = os.getenv("NCBI_API_KEY")
+    if api_key:
+        params["api_key"] = api_key
+    return params
+
+
+def _text(element: Any) -> str:
+    """Full text of an element, including inline markup such as <i> or <sup>."""
+    return "".join(element.itertext()).strip()
+
+
+def _publication_date(article: Any) -> Optional[date]:
+    """Date the record entered PubMed; month and day default to 1."""
+    pub_date = article.find(".//PubMedPubDate[@PubStatus='pubmed']")
+    if pub_date is None:
+        return None
+    try:
+        return date(
+            int(pub_date.findtext("Year")),
+            int(pub_date.findtext("Month") or 1),
+            int(pub_date.findtext("Day") or 1)
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_article(article: Any) -> Dict[str, Any]:
+    """
+    Convert a PubmedArticle or PubmedBookArticle element into the paper
+    dictionary used by the agents. Book chapters report the book title as
+    their journal; whole-book records use it as their title too.
+    """
+    pub_date = _publication_date(article)
+
+    if article.tag == "PubmedBookArticle":
+        citation, data = "BookDocument", "PubmedBookData"
+        book_title = article.find("BookDocument/Book/BookTitle")
+        book_title = _text(book_title) if book_title is not None else ""
+        # Chapter authors, else the book's own (editor) list
+        author_elements = (
+            article.findall("BookDocument/AuthorList/Author")
+            or article.findall("BookDocument/Book/AuthorList/Author")
+        )
+        title = article.find("BookDocument/ArticleTitle")
+        title = (_text(title) if title is not None else "") or book_title
+        journal = book_title
+    else:
+        citation, data = "MedlineCitation", "PubmedData"
+        author_elements = article.findall(".//AuthorList/Author")
+        title = article.find(".//ArticleTitle")
+        title = _text(title) if title is not None else ""
+        journal = article.findtext(".//Journal/Title")
+
+    # Keep the first 5 authors that have a full personal name
+    authors = [
+        f"{author.findtext('LastName')} {author.findtext('ForeName')}"
+        for author in author_elements[:5]
+        if author.findtext("LastName") and author.findtext("ForeName")
+    ]
+
+    abstract = "\n".join(
+        text for text in map(_text, article.iterfind(".//Abstract/AbstractText")) if text
+    )
+
+    # The article's own ids only; ReferenceList entries carry ArticleIds too
+    pmid = article.findtext(f"{citation}/PMID")
+    doi = article.findtext(f"{data}/ArticleIdList/ArticleId[@IdType='doi']")
+
+    return {
+        'title': title or 'No title available',
+        'authors': authors or ['Unknown'],
+        'abstract': abstract or 'No abstract available',
+        'pmid': (pmid or "").strip() or 'Unknown',
+        'publication_date': str(pub_date) if pub_date else 'Unknown',
+        'year': pub_date.year if pub_date else None,
+        'journal': journal or 'Unknown',
+        'doi': (doi or "").strip() or None
+    }
+
 
 def search_pubmed(
     query: str,
     max_results: int = 10,
-    min_year: int = 2023
+    min_year: int = 2023,
+    session: Optional[requests.Session] = None
 ) -> Dict[str, Any]:
     """
     Search PubMed for oncology research papers.
@@ -28,6 +164,7 @@ def search_pubmed(
         query: Search terms (e.g., "melanoma immunotherapy pembrolizumab")
         max_results: Maximum papers to return (default: 10)
         min_year: Earliest publication year (default: 2023)
+        session: Optional HTTP session to reuse across calls
         
     Returns:
         Dictionary containing:
@@ -42,55 +179,34 @@ def search_pubmed(
             for paper in result['papers']:
                 print(paper['title'])
     """
+    # Repeated (query, max_results, min_year) searches are served from disk
+    return _pubmed_cache(query, max_results, min_year, session=session)
+
+
+def _search_pubmed_uncached(
+    query: str,
+    max_results: int,
+    min_year: int,
+    session: Optional[requests.Session] = None
+) -> Dict[str, Any]:
+    """Run a PubMed search against E-utilities, bypassing the result cache."""
     try:
-        logger.info(f"Searching PubMed: '{query}' (max={max_results}, year>={min_year})")
-        
-        # Initialize PubMed API client
-        pubmed = PubMed(tool="OncologyResearchAgent", email="research@example.com")
+        logger.info("Searching PubMed: '%s' (max=%s, year>=%s)", query, max_results, min_year)
         
         # Add year filter to query
         search_query = f"{query} AND {min_year}:2025[dp]"
         
-        # Execute search
-        results = pubmed.query(search_query, max_results=max_results)
-        
-        papers = []
-        for article in results:
-            try:
-                # Extract publication date
-                pub_date = article.publication_date
-                if pub_date:
-                    if hasattr(pub_date, 'year'):
-                        year = pub_date.year
-                    else:
-                        year = int(str(pub_date)[:4])
-                else:
-                    year = None
-                
-                # Extract author list
-                authors = []
-                if hasattr(article, 'authors') and article.authors:
-                    for author in article.authors[:5]:  # Limit to first 5
-                        if hasattr(author, 'lastname') and hasattr(author, 'firstname'):
-                            name = f"{author['lastname']} {author['firstname']}"
-                            authors.append(name)
-                
-                # Build paper dictionary
-                paper = {
-                    'title': article.title or 'No title available',
-                    'authors': authors if authors else ['Unknown'],
-                    'abstract': article.abstract or 'No abstract available',
-                    'pmid': article.pubmed_id.split('\n')[0] if article.pubmed_id else 'Unknown',
-                    'publication_date': str(pub_date) if pub_date else 'Unknown',
-                    'year': year,
-                    'journal': article.journal or 'Unknown'
-                }
-                
-                papers.append(paper)
-                
-            except Exception as e:
-                logger.warning(f"Error parsing article: {e}")
-                continue
+        # Execute search (ESearch for ids, then one EFetch for the records)
+        owns_session = session is None
+        if owns_session:
+            session = requests.Session()
+        try:
+            pmids = _esearch(session, search_query, max_results)
+            articles = _efetch(session, pmids) if pmids else {}
+        finally:
+            if owns_session:
+                session.close()
+        papers = [articles[pmid] for pmid in pmids if pmid in articles]
         
         result = {
             'status': 'success',
@@ -103,7 +219,7 @@ def search_pubmed(
             }
         }
         
-        logger.info(f"Found {len(papers)} papers for '{query}'")
+        logger.info("Found %s papers for '%s'", len(papers), query)
         return result
         
     except Exception as e:
@@ -118,6 +234,190 @@ def search_pubmed(
         }
 
 
+_pubmed_cache = CachedSearch(_search_pubmed_uncached)
+
+
+async def asearch_pubmed(
+    query: str,
+    max_results: int = 10,
+    min_year: int = 2023,
+    session: Optional[requests.Session] = None
+) -> Dict[str, Any]:
+    """
+    Async variant of search_pubmed.
+
+    E-utilities calls share the synchronous rate limiter, so the search
+    runs in a worker thread rather than on the event loop.
+
+    Args:
+        query: Search terms
+        max_results: Maximum papers to return (default: 10)
+        min_year: Earliest publication year (default: 2023)
+        session: Optional HTTP session to reuse across calls
+
+    Returns:
+        Same dictionary as search_pubmed
+    """
+    return await asyncio.to_thread(search_pubmed, query, max_results, min_year, session=session)
+
+
+def _esearch(session: requests.Session, term: str, max_results: int) -> List[str]:
+    """Return the PMIDs matching a search term via NCBI ESearch."""
+    _throttle()
+    response = session.get(
+        f"{EUTILS_BASE_URL}/esearch.fcgi",
+        params=_ncbi_params(term=term, retmax=max_results, retmode="json"),
+        timeout=15
+    )
+    response.raise_for_status()
+    payload = orjson.loads(response.content) if orjson is not None else response.json()
+    return payload.get("esearchresult", {}).get("idlist", [])
+
+
+def _efetch(session: requests.Session, pmids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetch and parse records for many PMIDs, EFETCH_BATCH_SIZE ids per request."""
+    papers = {}
+    for start in range(0, len(pmids), EFETCH_BATCH_SIZE):
+        _throttle()
+        response = session.post(
+            f"{EUTILS_BASE_URL}/efetch.fcgi",
+            data=_ncbi_params(
+                id=",".join(pmids[start:start + EFETCH_BATCH_SIZE]),
+                retmode="xml"
+            ),
+            timeout=30
+        )
+        response.raise_for_status()
+        papers.update(_parse_efetch(response.content))
+    return papers
+
+
+def _parse_efetch(content: bytes) -> Dict[str, Dict[str, Any]]:
+    """Stream-parse an EFetch XML payload (articles and books) into papers keyed by PMID."""
+    papers = {}
+    for _, element in etree.iterparse(
+        BytesIO(content),
+        tag=("PubmedArticle", "PubmedBookArticle"),
+        resolve_entities=False,
+        no_network=True
+    ):
+        try:
+            paper = _parse_article(element)
+            if paper['pmid'] != 'Unknown':
+                papers[paper['pmid']] = paper
+        except Exception as e:
+            logger.warning("Error parsing article: %s", e)
+        # Drop parsed articles so memory stays flat across large batches
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+    return papers
+
+
+def search_pubmed_batch(
+    queries: List[str],
+    max_results_each: int = 12,
+    min_year: int = 2023,
+    session: Optional[requests.Session] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Search PubMed for several queries with a single EFetch round-trip.
+
+    Queries already in the search_pubmed() cache are answered from it. Each
+    remaining query gets its own ESearch (over one keep-alive session), then
+    the union of PMIDs is fetched in one batched EFetch and split back per query.
+
+    Args:
+        queries: Search terms, one entry per query
+        max_results_each: Maximum papers to return per query (default: 12)
+        min_year: Earliest publication year (default: 2023)
+        session: Optional HTTP session to reuse
+
+    Returns:
+        Dictionary mapping each query to a result shaped like search_pubmed()
+    """
+    if len(queries) == 1:
+        query = queries[0]
+        return {query: search_pubmed(
+            query, max_results=max_results_each, min_year=min_year, session=session
+        )}
+
+    results = {}
+    for query in queries:
+        cached = _pubmed_cache.lookup(query, max_results_each, min_year)
+        if cached is not None:
+            results[query] = cached
+    misses = [query for query in dict.fromkeys(queries) if query not in results]
+    if not misses:
+        return results
+
+    owns_session = session is None
+    if owns_session:
+        session = requests.Session()
+
+    try:
+        logger.info("Batch searching PubMed: %s queries (year>=%s)", len(misses), min_year)
+
+        pmids_by_query = {}
+        for query in misses:
+            try:
+                pmids_by_query[query] = _esearch(
+                    session, f"{query} AND {min_year}:2025[dp]", max_results_each
+                )
+            except Exception as e:
+                error_msg = f"PubMed search failed: {str(e)}"
+                logger.error(error_msg)
+                results[query] = {
+                    'status': 'error',
+                    'error_message': error_msg,
+                    'papers': [],
+                    'total_found': 0,
+                    'query': query
+                }
+
+        # One EFetch for the de-duplicated union of all PMIDs
+        all_pmids = list(dict.fromkeys(
+            pmid for pmids in pmids_by_query.values() for pmid in pmids
+        ))
+        articles = _efetch(session, all_pmids) if all_pmids else {}
+
+        for query, pmids in pmids_by_query.items():
+            papers = [articles[pmid] for pmid in pmids if pmid in articles]
+
+            results[query] = {
+                'status': 'success',
+                'papers': papers,
+                'total_found': len(papers),
+                'query': query,
+                'search_params': {
+                    'max_results': max_results_each,
+                    'min_year': min_year
+                }
+            }
+            _pubmed_cache.store(results[query], query, max_results_each, min_year)
+
+        logger.info("Batch PubMed search fetched %s papers", len(articles))
+        return results
+
+    except Exception as e:
+        error_msg = f"PubMed search failed: {str(e)}"
+        logger.error(error_msg)
+        # Cache hits are still good; only the uncached queries failed
+        for query in misses:
+            results[query] = {
+                'status': 'error',
+                'error_message': error_msg,
+                'papers': [],
+                'total_found': 0,
+                'query': query
+            }
+        return results
+
+    finally:
+        if owns_session:
+            session.close()
+
+
 # Test function
 if __name__ == "__main__":
     print("Testing PubMed Tool\n")
@@ -3,96 +3,225 @@ Google Scholar search tool for supplementary literature discovery.
 Complements PubMed with broader academic sources.
 """
 
+import re
 import logging
+from itertools import islice
 import requests
-from bs4 import BeautifulSoup
-from typing import Dict, Any, List
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from typing import Dict, Any, Iterator, List, Optional
+from tools.search_cache import CachedSearch
+
+try:
+    import httpx
+except ImportError:  # httpx is optional; only asearch_scholar needs it
+    httpx = None
+
+try:
+    import brotli  # noqa: F401  (enables br decoding in urllib3 and httpx)
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:  # brotli is optional; only advertise what can be decoded
+    _ACCEPT_ENCODING = "gzip, deflate"
 
 logger = logging.getLogger(__name__)
 
+SCHOLAR_URL = "https://scholar.google.com/scholar"
+_YEAR_RE = re.compile(r"\b(202[3-5])\b")
+_CAPTCHA_MARKERS = (b"gs_captcha_f", b"g-recaptcha", b"/sorry/index")
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "text/html",
+    "Accept-Encoding": _ACCEPT_ENCODING,
+    "Accept-Language": "en-US,en;q=0.9"
+}
+
+# Module-wide keep-alive session used when the caller does not supply one
+_SESSION = requests.Session()
+_SESSION.headers.update(_HEADERS)
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.3)
+))
+
+# Only result blocks are materialized; everything else on the page is skipped by lxml
+_RESULT_CLASSES = {"gs_r", "gs_or", "gs_scl"}
+_RESULT_STRAINER = SoupStrainer(
+    "div",
+    attrs={"class": lambda cls: cls is not None and _RESULT_CLASSES.issubset(cls.split())}
+)
 
-def search_scholar(query: str, max_results: int = 6) -> Dict[str, Any]:
+
+def _iter_papers(soup: BeautifulSoup) -> Iterator[Dict[str, Any]]:
+    """Yield a paper dict for each strained result block that has a title."""
+    for item in soup.find_all("div", recursive=False):
+        title_tag = item.select_one(".gs_rt a")
+        if not title_tag:
+            continue
+
+        title = title_tag.get_text(strip=True)
+        link = title_tag.get("href", "")
+        
+        snippet = item.select_one(".gs_rs")
+        snippet_text = snippet.get_text(strip=True) if snippet else "No abstract available"
+        
+        info = item.select_one(".gs_a")
+        info_text = info.get_text(strip=True) if info else ""
+        
+        match = _YEAR_RE.search(info_text)
+        year = match.group(1) if match else "2024"
+
+        yield {
+            "title": title,
+            "link": link,
+            "snippet": snippet_text,
+            "year": year,
+            "source": "Google Scholar",
+            "info": info_text
+        }
+
+
+def search_scholar(
+    query: str,
+    max_results: int = 6,
+    session: Optional[requests.Session] = None
+) -> Dict[str, Any]:
     """
     Search Google Scholar for academic publications.
     
     Args:
         query: Search terms
         max_results: Maximum number of results to retrieve
+        session: Optional HTTP session to reuse across calls
         
     Returns:
         Dictionary containing search status and papers list
     """
+    # Repeated (query, max_results) searches are served from disk
+    return _scholar_cache(query, max_results, session=session)
+
+
+def _search_scholar_uncached(
+    query: str,
+    max_results: int,
+    session: Optional[requests.Session] = None
+) -> Dict[str, Any]:
+    """Run a Google Scholar search, bypassing the result cache."""
     try:
-        url = "https://scholar.google.com/scholar"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-        params = {
-            "q": query,
-            "hl": "en",
-            "as_ylo": 2024,
-            "as_yhi": 2025
+        http = session if session is not None else _SESSION
+        response = http.get(SCHOLAR_URL, params=_params(query), headers=_HEADERS, timeout=12)
+        return _parse_response(response.status_code, response.content, max_results)
+
+    except Exception as e:
+        logger.error("Scholar search failed: %s", e)
+        return {
+            "status": "error",
+            "error": str(e),
+            "papers": []
         }
 
-        response = requests.get(url, params=params, headers=headers, timeout=12)
-        
-        if response.status_code != 200:
-            logger.warning(f"Scholar returned status {response.status_code}")
-            return {
-                "status": "error",
-                "message": f"HTTP {response.status_code}",
-                "papers": []
-            }
-
-        soup = BeautifulSoup(response.text, "html.parser")
-        papers = []
-
-        for item in soup.select(".gs_r.gs_or.gs_scl")[:max_results]:
-            title_tag = item.select_one(".gs_rt a")
-            if not title_tag:
-                continue
-
-            title = title_tag.get_text(strip=True)
-            link = title_tag.get("href", "")
-            
-            snippet = item.select_one(".gs_rs")
-            snippet_text = snippet.get_text(strip=True) if snippet else "No abstract available"
-            
-            info = item.select_one(".gs_a")
-            info_text = info.get_text(strip=True) if info else ""
-            
-            year = "2024"
-            for part in info_text.split("-"):
-                part = part.strip()
-                if part.isdigit() and 2023 <= int(part) <= 2025:
-                    year = part
-                    break
-
-            papers.append({
-                "title": title,
-                "link": link,
-                "snippet": snippet_text,
-                "year": year,
-                "source": "Google Scholar",
-                "info": info_text
-            })
-
-        logger.info(f"Scholar search returned {len(papers)} results")
-        
+
+# An empty page is more often a soft block than a genuine zero-hit query,
+# so it is retried next time rather than served for the whole TTL
+_scholar_cache = CachedSearch(
+    _search_scholar_uncached,
+    cacheable=lambda result: bool(result["papers"])
+)
+
+
+async def asearch_scholar(
+    query: str,
+    max_results: int = 6,
+    client: Optional["httpx.AsyncClient"] = None
+) -> Dict[str, Any]:
+    """
+    Async variant of search_scholar, sharing its result cache.
+
+    Args:
+        query: Search terms
+        max_results: Maximum number of results to retrieve
+        client: Optional httpx.AsyncClient to reuse across calls; a
+            short-lived client is created when omitted
+
+    Returns:
+        Dictionary containing search status and papers list
+    """
+    cached = _scholar_cache.lookup(query, max_results)
+    if cached is not None:
+        return cached
+
+    if httpx is None:
         return {
-            "status": "success",
-            "papers": papers,
-            "total_found": len(papers)
+            "status": "error",
+            "error": "httpx is required for asearch_scholar",
+            "papers": []
         }
 
+    try:
+        if client is None:
+            # requests follows redirects by default; httpx has to be asked to
+            async with httpx.AsyncClient(timeout=12, follow_redirects=True) as own_client:
+                response = await own_client.get(SCHOLAR_URL, params=_params(query), headers=_HEADERS)
+        else:
+            response = await client.get(
+                SCHOLAR_URL, params=_params(query), headers=_HEADERS,
+                timeout=12, follow_redirects=True
+            )
+        result = _parse_response(response.status_code, response.content, max_results)
+
     except Exception as e:
-        logger.error(f"Scholar search failed: {e}")
+        logger.error("Scholar search failed: %s", e)
         return {
             "status": "error",
             "error": str(e),
             "papers": []
         }
 
+    _scholar_cache.store(result, query, max_results)
+    return result
+
+
+def _params(query: str) -> Dict[str, Any]:
+    return {
+        "q": query,
+        "hl": "en",
+        "as_ylo": 2024,
+        "as_yhi": 2025
+    }
+
+
+def _parse_response(status_code: int, content: bytes, max_results: int) -> Dict[str, Any]:
+    """Build the search result from a Scholar HTTP response."""
+    if status_code != 200:
+        logger.warning("Scholar returned status %s", status_code)
+        return {
+            "status": "error",
+            "message": f"HTTP {status_code}",
+            "papers": []
+        }
+
+    # Scholar answers automated traffic with a 200 robot-check page
+    if any(marker in content for marker in _CAPTCHA_MARKERS):
+        logger.warning("Scholar returned a CAPTCHA page")
+        return {
+            "status": "error",
+            "message": "Blocked by Google Scholar CAPTCHA",
+            "papers": []
+        }
+
+    soup = BeautifulSoup(content, "lxml", parse_only=_RESULT_STRAINER)
+    # Stop as soon as enough usable results have been parsed
+    papers = list(islice(_iter_papers(soup), max_results))
+
+    logger.info("Scholar search returned %s results", len(papers))
+    
+    return {
+        "status": "success",
+        "papers": papers,
+        "total_found": len(papers)
+    }
+
 
 # Test function
 if __name__ == "__main__":
@@ -0,0 +1,151 @@
+"""
+On-disk result cache shared by the literature search tools.
+Successful searches are reused until their TTL expires; errors are never cached.
+"""
+
+import os
+import time
+import pickle
+import hashlib
+import logging
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Overridable per deployment; a TTL of 0 turns the literature cache off
+DEFAULT_CACHE_DIR = os.getenv("LITERATURE_CACHE_DIR", os.path.join("cache", "lit"))
+DEFAULT_CACHE_TTL_SECONDS = float(os.getenv("LITERATURE_CACHE_TTL_SECONDS", 24 * 60 * 60))
+
+# Every live cache, so configure() can retune the module-level tool caches
+_caches: "weakref.WeakSet[CachedSearch]" = weakref.WeakSet()
+
+
+def configure(cache_dir: Optional[str] = None, ttl_seconds: Optional[float] = None) -> None:
+    """
+    Change the directory and/or TTL of every literature search cache.
+
+    Args:
+        cache_dir: New on-disk cache directory (unchanged if None)
+        ttl_seconds: New time-to-live; 0 or less disables caching (unchanged if None)
+    """
+    for cache in list(_caches):
+        with cache._lock:
+            if cache_dir is not None and cache_dir != cache.cache_dir:
+                cache.cache_dir = cache_dir
+                # In-process entries belong to the old directory
+                cache._entries.clear()
+            if ttl_seconds is not None:
+                cache.ttl_seconds = ttl_seconds
+
+
+class CachedSearch:
+    """
+    Two-level cache around a literature search function.
+    Successful results are kept pickled in an in-process LRU and on disk,
+    so repeated queries skip the network until the TTL expires. Every hit
+    is unpickled afresh, so callers may freely mutate what they get back.
+    """
+
+    def __init__(
+        self,
+        search_fn: Callable[..., Dict[str, Any]],
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS,
+        max_entries: int = 128,
+        cacheable: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> None:
+        self.search_fn = search_fn
+        self.cacheable = cacheable
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def __call__(self, query: str, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        # Positional arguments form the key; keyword arguments (e.g. session)
+        # are passed through untouched
+        cached = self.lookup(query, *args)
+        if cached is not None:
+            return cached
+
+        result = self.search_fn(query, *args, **kwargs)
+        self.store(result, query, *args)
+        return result
+
+    def lookup(self, query: str, *args: Any) -> Optional[Dict[str, Any]]:
+        """Return the cached result for these search arguments, if still fresh."""
+        if self.ttl_seconds <= 0:
+            return None
+        cached = self._get(self._key(query, args))
+        if cached is not None:
+            logger.info("Cache hit for %s: %s", self.search_fn.__name__, " ".join(query.split()))
+        return cached
+
+    def store(self, result: Dict[str, Any], query: str, *args: Any) -> None:
+        """Cache a result for these search arguments; errors are never stored."""
+        if self.ttl_seconds <= 0 or result.get("status") != "success":
+            return
+        if self.cacheable is None or self.cacheable(result):
+            self._put(self._key(query, args), result)
+
+    def _key(self, query: str, args: Tuple[Any, ...]) -> str:
+        # Whitespace-insensitive key; the function name keeps sources apart
+        normalized = " ".join(query.split())
+        return hashlib.sha1(
+            repr((self.search_fn.__name__, normalized) + args).encode("utf-8")
+        ).hexdigest()
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, blob = entry
+                if now - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    return pickle.loads(blob)
+                del self._entries[key]
+
+        path = os.path.join(self.cache_dir, f"{key}.pkl")
+        try:
+            stored_at = os.path.getmtime(path)
+            if now - stored_at >= self.ttl_seconds:
+                return None
+            with open(path, "rb") as f:
+                blob = f.read()
+            result = pickle.loads(blob)
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            logger.warning("Ignoring unreadable cache entry %s: %s", path, exc)
+            return None
+
+        self._remember(key, stored_at, blob)
+        return result
+
+    def _put(self, key: str, result: Dict[str, Any]) -> None:
+        # Snapshot now; the caller keeps (and may mutate) its own result object
+        blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(key, time.time(), blob)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temp file first so readers never see a partial pickle
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, os.path.join(self.cache_dir, f"{key}.pkl"))
+        except Exception as exc:
+            logger.warning("Failed to write literature cache: %s", exc)
+
+    def _remember(self, key: str, stored_at: float, blob: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (stored_at, blob)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)